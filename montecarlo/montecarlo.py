@@ -1,8 +1,30 @@
 """Provide the primary functions."""
 
-import math
 import numpy as np
 
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+try:
+    import scipy.sparse
+    _HAVE_SCIPY = True
+except ImportError:
+    _HAVE_SCIPY = False
+
+_POW2_CACHE = {}
+
+def _pow2(N):
+    """Descending powers of two [2**(N-1), ..., 1], cached per N"""
+    a = _POW2_CACHE.get(N)
+    if a is None:
+        a = (1 << np.arange(N - 1, -1, -1)).astype(np.int64)
+        _POW2_CACHE[N] = a
+    return a
+
+
 class BitString:
     """Simple class to implement a config of bits"""
     def __init__(self, N):
@@ -13,22 +35,16 @@ class BitString:
         N: integer, length of bitstring
         """
         self.N = N
-        self.config = np.zeros(N, dtype=int) 
+        self.config = np.zeros(N, dtype=np.int8)
+        self._pow2 = _pow2(N)
 
     def __str__(self):
         """When bitstring is converted to a string, it lists the bits."""
-        string = '[ '
-        for x in self.config:
-            string = string + str(x) + ' '
-        string = string + ']'
-        return string
+        return '[ ' + ' '.join(str(x) for x in self.config) + ' ]'
 
     def __eq__(self, other):
         """When two bitstrings are being compared, it checks to see if the elements are the same"""
-        for x in range(self.N):
-            if self.config[x] != other.config[x]:
-                  return False
-        return True
+        return self.N == other.N and np.array_equal(self.config, other.config)
     
     def __len__(self):
         """When len() is called on a bitstring, it returns the number of bits in the bitstring"""
@@ -42,11 +58,7 @@ class BitString:
         ones  : int
             Number of ones in bitstring
         """
-        ones = 0
-        for x in self.config:
-            if x == 1:
-                ones = ones + 1
-        return ones
+        return int(np.count_nonzero(self.config))
     
     def off(self):
         """Find the number of 0 bits
@@ -56,11 +68,7 @@ class BitString:
         zeroes  : int
             Number of zeroes in bitstring
         """
-        zeroes = 0
-        for x in self.config:
-            if x == 0:
-                zeroes = zeroes + 1
-        return zeroes
+        return self.N - int(np.count_nonzero(self.config))
     
     def flip_site(self,i):
         """Flips the bit at the specified element
@@ -84,11 +92,7 @@ class BitString:
         dec  : int
             Decimal value of bitstring
         """
-        dec = 0
-        for x in range(self.N):
-            if self.config[x] == 1:
-                dec = dec + 2**(self.N - x - 1)
-        return dec
+        return int(self.config.dot(self._pow2))
  
 
     def set_config(self, s:list[int]):
@@ -99,9 +103,8 @@ class BitString:
         s   : List of integers
             List of bitstrings
         """
-        for x in range(self.N):
-            self.config[x] = s[x]
-        
+        self.config = np.asarray(s, dtype=np.int8)
+
     def set_int_config(self, dec:int):
         """Sets bitstring to a given decimal number
 
@@ -110,14 +113,130 @@ class BitString:
         dec   : int
             Decimal value to change bitstring to
         """
-        other_bs = BitString(self.N)
-        for x in range(other_bs.N):
-            if dec == 0:
-                break
-            if math.log2(dec) >= other_bs.N - x - 1:
-                other_bs.config[x] = 1
-                dec = dec - 2**(other_bs.N - x - 1)
-        self.config = other_bs.config
+        self.config = ((dec & self._pow2) != 0).astype(np.int8)
+
+if _HAVE_NUMBA:
+    @njit(cache=True)
+    def _popcount(s):
+        """Number of 1 bits in `s` (SWAR, constant five integer ops)."""
+        s = s - ((s >> 1) & 0x5555555555555555)
+        s = (s & 0x3333333333333333) + ((s >> 2) & 0x3333333333333333)
+        s = (s + (s >> 4)) & 0x0F0F0F0F0F0F0F0F
+        return (s * 0x0101010101010101) >> 56
+
+    @njit(cache=True)
+    def _state_energy(s, edge_i, edge_j, edge_w, mu, N):
+        """Energy of the configuration encoded by the integer `s`."""
+        e = 0.0
+        for m in range(edge_i.shape[0]):
+            # XOR of the two site bits: 0 when spins agree, 1 otherwise
+            diff = ((s >> (N - 1 - edge_i[m])) ^ (s >> (N - 1 - edge_j[m]))) & 1
+            e += edge_w[m] * (1 - 2 * diff)
+        for k in range(N):
+            e += mu[k] * (2 * ((s >> (N - 1 - k)) & 1) - 1)
+        return e
+
+    @njit(cache=True)
+    def _trailing_zeros(x):
+        """Position of the lowest set bit of `x` (x > 0)."""
+        n = 0
+        while x & 1 == 0:
+            x >>= 1
+            n += 1
+        return n
+
+    @njit(cache=True)
+    def _flip_delta(s, p, edge_i, edge_j, edge_w, site_ptr, site_nbr, site_w, mu, N):
+        """Energy change from flipping the bit at position `p` of state `s`."""
+        k = N - 1 - p
+        bk = (s >> p) & 1
+        de = 0.0
+        for m in range(site_ptr[k], site_ptr[k + 1]):
+            bn = (s >> (N - 1 - site_nbr[m])) & 1
+            if bk == bn:
+                de -= 2 * site_w[m]
+            else:
+                de += 2 * site_w[m]
+        de -= 2 * mu[k] * (2 * bk - 1)
+        return de
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _avg_kernel(edge_i, edge_j, edge_w, site_ptr, site_nbr, site_w, mu, N, T):
+        """Accumulate Z and the E/M moments over all 2**N states.
+
+        Streams states one integer at a time instead of materializing the
+        (2**N, N) bit matrix, so memory stays O(1) at any N. States are
+        visited in Gray-code order within each parallel block, so after one
+        full energy evaluation per block each step only costs the O(deg)
+        update for the single flipped spin.
+        """
+        n_states = 1 << N
+        n_blocks = 1 << min(N, 10)
+        blk = n_states // n_blocks
+
+        emin = np.inf
+        for b in prange(n_blocks):
+            i0 = b * blk
+            s = i0 ^ (i0 >> 1)
+            e = _state_energy(s, edge_i, edge_j, edge_w, mu, N)
+            for i in range(i0, i0 + blk):
+                emin = min(emin, e)
+                if i + 1 < i0 + blk:
+                    p = _trailing_zeros(i + 1)
+                    e += _flip_delta(s, p, edge_i, edge_j, edge_w,
+                                     site_ptr, site_nbr, site_w, mu, N)
+                    s ^= 1 << p
+
+        Z = 0.0
+        Esum = 0.0
+        EEsum = 0.0
+        Msum = 0.0
+        MMsum = 0.0
+        for b in prange(n_blocks):
+            i0 = b * blk
+            s = i0 ^ (i0 >> 1)
+            e = _state_energy(s, edge_i, edge_j, edge_w, mu, N)
+            for i in range(i0, i0 + blk):
+                Mi = 2 * _popcount(s) - N
+                w = np.exp(-(e - emin) / T)
+                Z += w
+                Esum += w * e
+                EEsum += w * e * e
+                Msum += w * Mi
+                MMsum += w * Mi * Mi
+                if i + 1 < i0 + blk:
+                    p = _trailing_zeros(i + 1)
+                    e += _flip_delta(s, p, edge_i, edge_j, edge_w,
+                                     site_ptr, site_nbr, site_w, mu, N)
+                    s ^= 1 << p
+        return Z, Esum, EEsum, Msum, MMsum
+
+
+def _mc_sweep(config, site_ptr, site_nbr, site_w, mu, N, T, n_steps, seed):
+    """Metropolis-sample `config` in place for `n_steps` single-spin flips.
+
+    Operates on the raw int8 config array so the flip and the local
+    energy change stay inside one compiled loop; BitString.flip_site is
+    deliberately not JIT-ed, as per-call dispatch overhead would dwarf
+    the work it does.
+    """
+    np.random.seed(seed)
+    for _ in range(n_steps):
+        k = np.random.randint(0, N)
+        bk = config[k]
+        de = 0.0
+        for m in range(site_ptr[k], site_ptr[k + 1]):
+            if bk == config[site_nbr[m]]:
+                de -= 2 * site_w[m]
+            else:
+                de += 2 * site_w[m]
+        de -= 2 * mu[k] * (2 * bk - 1)
+        if de <= 0.0 or np.random.random() < np.exp(-de / T):
+            config[k] = 1 - bk
+
+if _HAVE_NUMBA:
+    _mc_sweep = njit(cache=True)(_mc_sweep)
+
 
 class IsingHamiltonian:
     """Class for an Ising Hamiltonian of arbitrary dimensionality
@@ -136,24 +255,53 @@ class IsingHamiltonian:
             Strength of coupling, e.g,
             [(4, -1.1), (6, -.1)]
             [(5, -1.1), (7, -.1)]
+            Kept as given for API compatibility; all computations run on
+            the flat edge arrays built below, never on this ragged list.
         mu: vector, optional
             local fields
         """
         self.J = J
         self.mu = mu
 
-        self.nodes = []
-        self.js = []
-
-        for i in range(len(self.J)):
-            self.nodes.append(np.zeros(len(self.J[i]), dtype=int))
-            self.js.append(np.zeros(len(self.J[i])))
-            for jidx, j in enumerate(self.J[i]):
-                self.nodes[i][jidx] = j[0]
-                self.js[i][jidx] = j[1]
-        self.mu = np.array([i for i in self.mu])
+        self.nodes = [np.array([j[0] for j in row], dtype=int) for row in self.J]
+        self.js = [np.array([j[1] for j in row], dtype=float) for row in self.J]
+        self.mu = np.ascontiguousarray(mu, dtype=np.float64)
         self.N = len(self.J)
 
+        self._build_edge_arrays()
+
+    def _build_edge_arrays(self):
+        """Flatten `self.J` into the contiguous arrays used by all hot paths
+
+        Builds _edge_i/_edge_j/_edge_w with each undirected edge stored
+        once, plus per-site neighbor lists in CSR layout: the neighbors of
+        site k are _site_nbr[_site_ptr[k]:_site_ptr[k + 1]]
+        """
+        edges = [(i, j[0], j[1]) for i in range(self.N) for j in self.J[i] if j[0] >= i]
+        self._edge_i = np.array([e[0] for e in edges], dtype=int)
+        self._edge_j = np.array([e[1] for e in edges], dtype=int)
+        self._edge_w = np.array([e[2] for e in edges])
+
+        nbrs = [[] for _ in range(self.N)]
+        for i, j, w in edges:
+            nbrs[i].append((j, w))
+            if j != i:
+                nbrs[j].append((i, w))
+        self._site_ptr = np.cumsum([0] + [len(n) for n in nbrs])
+        self._site_nbr = np.array([j for n in nbrs for j, w in n], dtype=int)
+        self._site_w = np.array([w for n in nbrs for j, w in n])
+
+        # Upper-triangular sparse view of the couplings, for interop with
+        # scipy algorithms (e.g. eigensolver cross-checks at small N).
+        # Its indices/data mirror _edge_j/_edge_w; None without scipy.
+        if _HAVE_SCIPY:
+            self.J_csr = scipy.sparse.csr_matrix(
+                (self._edge_w.astype(float), (self._edge_i, self._edge_j)),
+                shape=(self.N, self.N),
+            )
+        else:
+            self.J_csr = None
+
     def energy(self, config):
         """Compute energy of configuration, `config`
 
@@ -173,19 +321,8 @@ class IsingHamiltonian:
         if len(config.config) != len(self.J):
             error("wrong dimension")
 
-        e = 0.0
-        for i in range(config.N):
-            # print()
-            # print(i)
-            for j in self.J[i]:
-                if j[0] < i:
-                    continue
-                # print(j)
-                if config.config[i] == config.config[j[0]]:
-                    e += j[1]
-                else:
-                    e -= j[1]
-
+        same = config.config[self._edge_i] == config.config[self._edge_j]
+        e = float(np.where(same, self._edge_w, -self._edge_w).sum())
         e += np.dot(self.mu, 2 * config.config - 1)
         return e
 
@@ -208,33 +345,92 @@ class IsingHamiltonian:
         MS : float
             Magnetic Susceptability
         """
-        E = 0.0
-        M = 0.0
-        Z = 0.0
-        EE = 0.0
-        MM = 0.0
-
-        conf = BitString(self.N)
-
-        for i in range(2 ** conf.N):
-            conf.set_int_config(i)
-            Ei = self.energy(conf)
-            Zi = np.exp(-Ei / T)
-            E += Ei * Zi
-            EE += Ei * Ei * Zi
-            Mi = np.sum(2 * conf.config - 1)
-            M += Mi * Zi
-            MM += Mi * Mi * Zi
-            Z += Zi
-
-        E = E / Z
-        M = M / Z
-        EE = EE / Z
-        MM = MM / Z
-
-        HC = (EE - E * E) / (T * T)
-        MS = (MM - M * M) / T
-        return E, M, HC, MS
+        if _HAVE_NUMBA:
+            Z, Esum, EEsum, Msum, MMsum = _avg_kernel(
+                self._edge_i, self._edge_j, self._edge_w,
+                self._site_ptr, self._site_nbr, self._site_w,
+                self.mu, self.N, T
+            )
+            E_avg = Esum / Z
+            M_avg = Msum / Z
+            EE = EEsum / Z
+            MM = MMsum / Z
+        else:
+            E, M = self._enumerate_states()
+            # Shift the exponent by its maximum for numerical stability;
+            # the shift cancels in every w / Z ratio.
+            x = -E / T
+            w = np.exp(x - x.max())
+            Z = w.sum()
+
+            # einsum streams each array once with no w*E temporaries
+            E_avg = np.einsum('i,i->', w, E) / Z
+            M_avg = np.einsum('i,i->', w, M) / Z
+            EE = np.einsum('i,i,i->', w, E, E) / Z
+            MM = np.einsum('i,i,i->', w, M, M) / Z
+
+        HC = (EE - E_avg * E_avg) / (T * T)
+        MS = (MM - M_avg * M_avg) / T
+        return E_avg, M_avg, HC, MS
+
+    def compute_average_values_scan(self, Ts):
+        """Compute average values exactly for a list of temperatures
+
+        The 2**N states are enumerated once and each temperature only
+        costs a few reductions over the precomputed energies, instead of
+        re-enumerating per temperature.
+
+        Parameters
+        ----------
+        Ts     : array-like
+            Temperatures
+
+        Returns
+        -------
+        E  : ndarray
+            Energy at each temperature
+        M  : ndarray
+            Magnetization at each temperature
+        HC : ndarray
+            Heat Capacity at each temperature
+        MS : ndarray
+            Magnetic Susceptability at each temperature
+        """
+        Ts = np.asarray(Ts, dtype=float)
+        E, M = self._enumerate_states()
+
+        # Shift by the ground-state energy for numerical stability; the
+        # shift cancels in every W / Z ratio.
+        W = np.exp(-(E - E.min())[None, :] / Ts[:, None])
+        Z = W.sum(axis=1)
+
+        E_avg = W @ E / Z
+        M_avg = W @ M / Z
+        EE = W @ (E * E) / Z
+        MM = W @ (M * M) / Z
+
+        HC = (EE - E_avg * E_avg) / (Ts * Ts)
+        MS = (MM - M_avg * M_avg) / Ts
+        return E_avg, M_avg, HC, MS
+
+    def _enumerate_states(self):
+        """Compute energy and magnetization for all 2**N configurations
+
+        Returns
+        -------
+        E  : ndarray
+            Energy of each configuration, indexed by its decimal value
+        M  : ndarray
+            Magnetization of each configuration
+        """
+        idx = np.arange(2 ** self.N, dtype=np.int64)
+        bits = ((idx[:, None] & _pow2(self.N)) != 0).astype(np.int8)
+        spins = 2 * bits - 1
+
+        same = bits[:, self._edge_i] == bits[:, self._edge_j]
+        E = np.where(same, self._edge_w, -self._edge_w).sum(axis=1) + spins @ self.mu
+        M = spins.sum(axis=1)
+        return E, M
 
     def get_lowest_energy_config(self):
         """Finds lowest energy configuration
@@ -246,25 +442,40 @@ class IsingHamiltonian:
         my_bs.config  : Bitstring
             Bitstring configuration with lowest energy
         """
-        x = [] # Store list of indices
-        y = [] # Store list of energies
-        xmin = None # configuration of minimum energy configuration
-        emin = 0 # minimum of energy
-        my_bs = BitString(self.N)
+        E, _ = self._enumerate_states()
+        imin = int(E.argmin())
+        emin = float(E[imin])
 
-        my_bs.set_int_config(0)
-        emin = self.energy(my_bs)
-        for i in range(np.power(2, my_bs.N)):
-            my_bs.set_int_config(i)
-            ecurrent = self.energy(my_bs)
-            x.append(i)
-            y.append(ecurrent)
-            if ecurrent < emin:
-                emin = ecurrent
-                xmin = i
-        my_bs.set_int_config(xmin)
+        my_bs = BitString(self.N)
+        my_bs.set_int_config(imin)
         return emin, my_bs.config
 
+    def sweep(self, config, T, n_steps=1000, seed=None):
+        """Metropolis Monte Carlo sampling of `config`, modified in place
+
+        Parameters
+        ----------
+        config   : BitString
+            configuration to sample, updated in place
+        T        : float
+            Temperature
+        n_steps  : int, optional
+            Number of single-spin flip attempts
+        seed     : int, optional
+            Seed for the random number generator; drawn at random if
+            not given
+
+        Returns
+        -------
+        config  : BitString
+            The sampled configuration (same object as the input)
+        """
+        if seed is None:
+            seed = np.random.randint(2 ** 31 - 1)
+        _mc_sweep(config.config, self._site_ptr, self._site_nbr, self._site_w,
+                  self.mu, self.N, T, n_steps, seed)
+        return config
+
 def canvas(with_attribution=True):
     """
     Placeholder function to show example docstring (NumPy format).
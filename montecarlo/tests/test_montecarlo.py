@@ -49,6 +49,45 @@ def test_montecarlo_IsingHamiltonian_get_lowest_energy_config():
     assert(np.isclose(emin,   -3.20000))
     assert((cmin == test).all())
 
+def test_montecarlo_IsingHamiltonian_compute_average_values_scan():
+    N = 6
+    Jval = 2.0
+    mus = np.zeros(N)
+    J = [[] for i in range(N)]
+    for i in range(N):
+        J[i].append(((i+1) % N, Jval))
+        J[(i+1) % N].append((i, Jval))
+
+    ham = montecarlo.IsingHamiltonian(J, mus)
+    Ts = [1.0, 2.0, 5.0]
+    E, M, HC, MS = ham.compute_average_values_scan(Ts)
+
+    for i, T in enumerate(Ts):
+        Ei, Mi, HCi, MSi = ham.compute_average_values(T)
+        assert(np.isclose(E[i], Ei))
+        assert(np.isclose(M[i], Mi))
+        assert(np.isclose(HC[i], HCi))
+        assert(np.isclose(MS[i], MSi))
+
+def test_montecarlo_IsingHamiltonian_sweep():
+    N = 6
+    Jval = 2.0
+    mus = np.zeros(N)
+    J = [[] for i in range(N)]
+    for i in range(N):
+        J[i].append(((i+1) % N, Jval))
+        J[(i+1) % N].append((i, Jval))
+
+    ham = montecarlo.IsingHamiltonian(J, mus)
+    conf = montecarlo.BitString(N)
+    conf.set_int_config(11)
+    e0 = ham.energy(conf)
+
+    ham.sweep(conf, T=0.1, n_steps=500, seed=7)
+
+    assert(np.isin(conf.config, [0, 1]).all())
+    assert(ham.energy(conf) <= e0)
+
 def test_bitstring_constructor():
     bs = montecarlo.BitString(4)
     test = np.array([0, 0, 0, 0])